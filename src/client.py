@@ -0,0 +1,39 @@
+import os
+import threading
+
+from cachetools import TTLCache
+from dotenv import load_dotenv
+from github import Github
+from github.Repository import Repository
+
+# Load environment variables from .env file
+load_dotenv()
+
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+if not GITHUB_TOKEN:
+    raise RuntimeError("GITHUB_TOKEN not found in environment variables. Please set it in your .env file.")
+
+# Keep-alive connections PyGithub's requests adapter may hold open, so concurrent write calls reuse TLS sessions
+GITHUB_POOL_SIZE = int(os.getenv("GITHUB_POOL_SIZE", "20"))
+
+# Used by the web server, always on its github_executor threads
+github_client = Github(GITHUB_TOKEN, pool_size=GITHUB_POOL_SIZE)
+
+# Repository objects by (client, full name), so write calls skip the GET /repos/{owner}/{name} that get_repo issues first
+repo_cache: TTLCache = TTLCache(maxsize=512, ttl=300)
+repo_cache_lock = threading.Lock()
+
+def get_cached_repo(repo_name: str, client: Github = github_client) -> Repository:
+    with repo_cache_lock:
+        repo = repo_cache.get((client, repo_name))
+    if repo is None:
+        repo = client.get_repo(repo_name)
+        with repo_cache_lock:
+            repo_cache[(client, repo_name)] = repo
+    return repo
+
+def forget_repo(name: str):
+    """Drop cached repositories called `name` under any owner, e.g. after creating one."""
+    with repo_cache_lock:
+        for key in [k for k in repo_cache if k[1].split("/", 1)[-1] == name]:
+            repo_cache.pop(key, None)
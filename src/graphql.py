@@ -0,0 +1,47 @@
+from typing import Optional
+
+import httpx
+
+REPOSITORY_QUERY = """
+query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) {
+    name
+    nameWithOwner
+    description
+    isPrivate
+    repositoryTopics(first: 50) { nodes { topic { name } } }
+  }
+}
+"""
+
+# Open pull requests newest first, matching the REST listing's default order
+PULL_REQUESTS_QUERY = """
+query($owner: String!, $name: String!, $first: Int!, $after: String) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(first: $first, after: $after, states: OPEN, orderBy: {field: CREATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes { databaseId title headRefName baseRefName }
+    }
+  }
+}
+"""
+
+# GraphQL error types that correspond to an HTTP status; anything else is reported as a bad gateway
+ERROR_TYPE_STATUS = {"NOT_FOUND": 404, "FORBIDDEN": 403, "RATE_LIMITED": 429}
+
+class GraphQLError(Exception):
+    """GitHub answered a GraphQL query with an errors list (GraphQL errors still come back as HTTP 200)."""
+
+    def __init__(self, errors: list):
+        self.errors = errors
+        self.status = next((ERROR_TYPE_STATUS[e["type"]] for e in errors if e.get("type") in ERROR_TYPE_STATUS), 502)
+        super().__init__("; ".join(e.get("message", "Unknown GraphQL error") for e in errors))
+
+async def gql(client: httpx.AsyncClient, query: str, variables: Optional[dict] = None) -> dict:
+    """POST a query to GitHub's GraphQL API through the shared client and return its data."""
+    response = await client.post("/graphql", json={"query": query, "variables": variables or {}})
+    response.raise_for_status()
+    payload = response.json()
+    if payload.get("errors"):
+        raise GraphQLError(payload["errors"])
+    return payload["data"]
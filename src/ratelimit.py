@@ -0,0 +1,62 @@
+import logging
+from typing import Dict, Iterable
+
+from redis import asyncio as redis_async
+from redis.exceptions import RedisError
+from starlette.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+# INCR the client's window counter and start the window's expiry on the first hit, atomically in one round trip
+INCR_EXPIRE_SCRIPT = """
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return count
+"""
+
+class RateLimiterMiddleware:
+    """ASGI middleware enforcing fixed-window, per-client request limits on path prefixes.
+
+    Counters live in Redis so every worker shares them. `rules` maps a path prefix to
+    {"limit": requests, "period": seconds}. If Redis is unreachable requests are let through.
+    """
+
+    def __init__(self, app, rules: Dict[str, dict], redis: redis_async.Redis, trusted_proxies: Iterable[str] = ()):
+        self.app = app
+        self.rules = rules
+        self.redis = redis
+        self.incr_expire = redis.register_script(INCR_EXPIRE_SCRIPT)
+        self.trusted_proxies = set(trusted_proxies)
+
+    async def __call__(self, scope, receive, send):
+        prefix = next((p for p in self.rules if scope["type"] == "http" and scope["path"].startswith(p)), None)
+        if prefix is None:
+            await self.app(scope, receive, send)
+            return
+        rule = self.rules[prefix]
+        key = f"ratelimit:{prefix}:{self.client_ip(scope)}"
+        try:
+            count = await self.incr_expire(keys=[key], args=[rule["period"]])
+            retry_after = await self.redis.ttl(key) if count > rule["limit"] else 0
+        except RedisError:
+            logger.warning("Rate limiter backend unavailable, allowing request")
+            await self.app(scope, receive, send)
+            return
+        if count > rule["limit"]:
+            response = JSONResponse({"detail": "Rate limit exceeded"}, status_code=429, headers={"Retry-After": str(max(retry_after, 1))})
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+    def client_ip(self, scope) -> str:
+        """The connecting address, or the nearest untrusted X-Forwarded-For hop when behind a trusted proxy."""
+        host = scope["client"][0] if scope.get("client") else "unknown"
+        if host not in self.trusted_proxies:
+            return host
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                hops = [hop.strip() for hop in value.decode("latin-1").split(",")]
+                return next((hop for hop in reversed(hops) if hop not in self.trusted_proxies), host)
+        return host
@@ -1,324 +1,656 @@
+import asyncio
+import functools
 import os
-from fastapi import FastAPI, HTTPException, Body
-from github import Github
-from dotenv import load_dotenv
-from pydantic import BaseModel
-from typing import Optional, List
-
-# Load environment variables from .env file
-load_dotenv()
-
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-if not GITHUB_TOKEN:
-    raise RuntimeError("GITHUB_TOKEN not found in environment variables. Please set it in your .env file.")
-
-github_client = Github(GITHUB_TOKEN)
-
-app = FastAPI()
-
-class BranchActionRequest(BaseModel):
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+import httpx
+import orjson
+from cachetools import LRUCache, TTLCache
+from fastapi import FastAPI, HTTPException, Body, Query, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from github import GithubException
+from pydantic import BaseModel, ConfigDict, Field
+from redis import asyncio as redis_async
+from requests.exceptions import ConnectionError as RequestsConnectionError, RetryError, Timeout as RequestsTimeout
+from typing import Any, Optional, List
+
+from .client import GITHUB_POOL_SIZE, GITHUB_TOKEN, get_cached_repo
+from .graphql import PULL_REQUESTS_QUERY, REPOSITORY_QUERY, GraphQLError, gql
+from .ratelimit import RateLimiterMiddleware
+from .singleflight import SingleFlight
+from .tasks import create_branch_task, create_pull_request_task, create_repo_task, merge_pr_task, task_status
+
+GITHUB_API_URL = "https://api.github.com"
+
+# Optional; when set, /github/ endpoints are rate limited per client so one caller can't drain the shared token's quota
+REDIS_URL = os.getenv("REDIS_URL")
+redis_client = redis_async.from_url(REDIS_URL) if REDIS_URL else None
+
+# Shared, pooled async client for read endpoints; created and closed by the app lifespan
+http_client: Optional[httpx.AsyncClient] = None
+
+# Threads for blocking PyGithub calls, no more than its pooled connections so requests never logs "Connection pool
+# is full" and discards a warm one. Kept apart from the default executor, which also serves DNS lookups and Celery
+# publishes, so PyGithub's pauses between writes can't stall those; created and shut down by the app lifespan
+github_executor: Optional[ThreadPoolExecutor] = None
+
+async def run_github(func, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(github_executor, functools.partial(func, *args, **kwargs))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global http_client, github_executor
+    github_executor = ThreadPoolExecutor(max_workers=GITHUB_POOL_SIZE, thread_name_prefix="github")
+    http_client = httpx.AsyncClient(
+        base_url=GITHUB_API_URL,
+        headers={"Authorization": f"Bearer {GITHUB_TOKEN}", "Accept": "application/vnd.github+json"},
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        # Like PyGithub: follow GitHub's 301s for renamed/transferred repos and allow 15s for large pages
+        follow_redirects=True,
+        timeout=httpx.Timeout(15),
+    )
+    try:
+        yield
+    finally:
+        await http_client.aclose()
+        github_executor.shutdown()
+        if redis_client is not None:
+            await redis_client.aclose()
+
+# Every route declares a response model, so FastAPI serializes straight to JSON bytes with Pydantic's compiled
+# serializer; a custom default_response_class would disable that path
+app = FastAPI(lifespan=lifespan)
+
+# Failures reported by GitHub itself, or GitHub not answering usefully (PyGithub's retries exhausted, connection
+# failures, timeouts); handlers turn these into an HTTPException with GitHub's status and message, or 502/504
+GITHUB_ERRORS = (
+    GithubException, httpx.HTTPStatusError, GraphQLError,
+    RetryError, RequestsConnectionError, RequestsTimeout, httpx.TimeoutException,
+)
+
+def github_error(e: Exception, action: str) -> HTTPException:
+    """Build the HTTPException for a GitHub failure from its status and short message, not the full response body."""
+    if isinstance(e, GithubException):
+        status, message = e.status, e.data.get("message") if isinstance(e.data, dict) else None
+    elif isinstance(e, httpx.HTTPStatusError):
+        status = e.response.status_code
+        try:
+            message = e.response.json().get("message")
+        except (ValueError, AttributeError):
+            message = None
+    elif isinstance(e, RetryError):
+        status, message = 502, "GitHub kept failing after retries"
+    elif isinstance(e, (RequestsTimeout, httpx.TimeoutException)):
+        status, message = 504, "GitHub timed out"
+    elif isinstance(e, RequestsConnectionError):
+        status, message = 502, "Could not reach GitHub"
+    else:
+        status, message = e.status, str(e)
+    return HTTPException(status_code=status, detail=f"{action}: {message or 'GitHub error'}")
+
+@app.exception_handler(Exception)
+async def unhandled_error(request: Request, exc: Exception):
+    # Starlette re-raises after sending this response, so the server logs the traceback once
+    return JSONResponse({"detail": "Internal server error"}, status_code=500)
+
+# Listing payloads are highly repetitive JSON; small responses aren't worth the CPU
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+if redis_client is not None:
+    app.add_middleware(RateLimiterMiddleware, rules={"/github/": {"limit": 30, "period": 60}}, redis=redis_client, trusted_proxies=["127.0.0.1"])
+
+# Short-lived cache for read endpoints, keyed by (endpoint, args). Writes made in this process invalidate what they
+# change; writes queued to Celery are invalidated when GET /tasks/{id} sees them succeed (see TASK_INVALIDATIONS)
+response_cache: TTLCache = TTLCache(maxsize=1024, ttl=60)
+response_cache_lock = threading.Lock()
+
+# Concurrent misses for the same key share one GitHub call instead of each fetching it
+cache_loads = SingleFlight()
+
+# Bumped by every invalidate(); invalidated_at records the generation per prefix so a load that started before an
+# invalidation of its key doesn't store what may be pre-write data
+cache_generation = 0
+invalidated_at: TTLCache = TTLCache(maxsize=4096, ttl=300)
+
+async def cached(key: tuple, loader):
+    with response_cache_lock:
+        if key in response_cache:
+            return response_cache[key]
+
+    async def load():
+        started = cache_generation
+        value = await loader()
+        with response_cache_lock:
+            if not any(invalidated_at.get(key[:i], 0) > started for i in range(1, len(key) + 1)):
+                response_cache[key] = value
+        return value
+
+    return await cache_loads.do(key, load)
+
+def invalidate(*prefixes: tuple):
+    """Drop every cached or in-flight entry whose key starts with one of the prefixes, e.g. all pages of ("list_branches", repo)."""
+    global cache_generation
+    with response_cache_lock:
+        cache_generation += 1
+        for prefix in prefixes:
+            invalidated_at[prefix] = cache_generation
+        for key in [k for k in response_cache if any(k[:len(p)] == p for p in prefixes)]:
+            response_cache.pop(key, None)
+        for key in [k for k in cache_loads.inflight if any(k[:len(p)] == p for p in prefixes)]:
+            cache_loads.forget(key)
+
+# Projections applied to GitHub responses before anything is cached, so caches hold only the fields endpoints return
+def user_summary(user: dict) -> dict:
+    return {"login": user["login"], "name": user["name"], "public_repos": user["public_repos"]}
+
+def names(items: list) -> list:
+    return [i["name"] for i in items]
+
+def full_names(items: list) -> list:
+    return [i["full_name"] for i in items]
+
+def logins(items: list) -> list:
+    return [i["login"] for i in items]
+
+def issue_rows(items: list) -> list:
+    return [{"number": i["number"], "title": i["title"], "state": i["state"]} for i in items]
+
+def review_rows(items: list) -> list:
+    return [{"user": r["user"]["login"], "state": r["state"], "body": r["body"]} for r in items]
+
+def webhook_rows(items: list) -> list:
+    return [{"id": h["id"], "url": h["config"].get("url")} for h in items]
+
+def comparison_summary(comparison: dict) -> dict:
+    return {"ahead_by": comparison["ahead_by"], "behind_by": comparison["behind_by"], "commits": [c["sha"] for c in comparison["commits"]]}
+
+def core_rate_limit(rate: dict) -> dict:
+    core = rate["resources"]["core"]
+    reset = datetime.fromtimestamp(core["reset"], tz=timezone.utc)
+    return {"limit": core["limit"], "remaining": core["remaining"], "reset": str(reset)}
+
+# Last ETag, projected body and Link header per (URL, projection); 304 responses are answered from here and
+# don't count against the rate limit
+etag_cache: LRUCache = LRUCache(maxsize=1024)
+
+async def github_fetch(url: str, project, params: Optional[dict] = None):
+    """GET a GitHub API URL with If-None-Match, returning (project(body), links)."""
+    request = http_client.build_request("GET", url, params=params)
+    key = (str(request.url), project)
+    previous = etag_cache.get(key)
+    if previous:
+        request.headers["If-None-Match"] = previous[0]
+    response = await http_client.send(request)
+    if response.status_code == 304 and previous:
+        return previous[1], previous[2]
+    response.raise_for_status()
+    body = project(response.json())
+    etag = response.headers.get("ETag")
+    if etag:
+        etag_cache[key] = (etag, body, response.links)
+    return body, response.links
+
+async def github_get(path: str, project, params: Optional[dict] = None):
+    body, _ = await github_fetch(path, project, params=params)
+    return body
+
+async def github_get_page(path: str, project, page: int, per_page: int, params: Optional[dict] = None):
+    """Fetch a single page of a list endpoint; next_page is None on the last page."""
+    items, links = await github_fetch(path, project, params={**(params or {}), "page": page, "per_page": per_page})
+    return {"items": items, "next_page": page + 1 if "next" in links else None}
+
+async def github_get_all(path: str, project, params: Optional[dict] = None) -> list:
+    """Fetch every page of a list endpoint by following the Link headers, like iterating a PaginatedList."""
+    items, links = await github_fetch(path, project, params={"per_page": 100, **(params or {})})
+    items = list(items)
+    while "next" in links:
+        page, links = await github_fetch(links["next"]["url"], project)
+        items.extend(page)
+    return items
+
+class RequestModel(BaseModel):
+    """Base for request bodies: immutable, unknown fields rejected, surrounding whitespace stripped from strings."""
+    model_config = ConfigDict(frozen=True, extra="forbid", str_strip_whitespace=True)
+
+class BranchActionRequest(RequestModel):
     repo_name: str
     branch_name: str
     base_branch: Optional[str] = None  # For creating a branch
 
-class PullRequestRequest(BaseModel):
+class PullRequestRequest(RequestModel):
     repo_name: str
     title: str
     body: Optional[str] = ""
     head: str  # The name of the branch where your changes are implemented
     base: str  # The name of the branch you want the changes pulled into
 
-class RepoCreateRequest(BaseModel):
+class RepoCreateRequest(RequestModel):
     name: str
     description: Optional[str] = ""
     private: bool = False
     org_name: Optional[str] = None
 
-class IssueCreateRequest(BaseModel):
+class IssueCreateRequest(RequestModel):
     repo_name: str
     title: str
     body: Optional[str] = ""
-    assignees: Optional[List[str]] = []
-    labels: Optional[List[str]] = []
+    assignees: List[str] = Field(default_factory=list)
+    labels: List[str] = Field(default_factory=list)
 
-class IssueCommentRequest(BaseModel):
+class IssueCommentRequest(RequestModel):
     repo_name: str
     issue_number: int
     comment: str
 
-class IssueStateRequest(BaseModel):
+class IssueStateRequest(RequestModel):
     repo_name: str
     issue_number: int
     state: str  # 'open' or 'closed'
 
-class PRMergeRequest(BaseModel):
+class PRMergeRequest(RequestModel):
     repo_name: str
     pr_number: int
     commit_message: Optional[str] = None
 
-class PRCloseRequest(BaseModel):
+class PRCloseRequest(RequestModel):
     repo_name: str
     pr_number: int
 
-class BranchDeleteRequest(BaseModel):
+class BranchDeleteRequest(RequestModel):
     repo_name: str
     branch_name: str
 
-class BranchCompareRequest(BaseModel):
+class BranchCompareRequest(RequestModel):
     repo_name: str
     base: str
     head: str
 
-class WebhookListRequest(BaseModel):
+class WebhookListRequest(RequestModel):
     repo_name: str
 
-class CollaboratorRequest(BaseModel):
+class CollaboratorRequest(RequestModel):
     repo_name: str
     username: str
     permission: Optional[str] = "push"
 
-class PRCommentRequest(BaseModel):
+class PRCommentRequest(RequestModel):
     repo_name: str
     pr_number: int
     comment: str
 
-@app.get("/")
-def read_root():
+class MessageResponse(BaseModel):
+    message: str
+
+class TaskAcceptedResponse(BaseModel):
+    task_id: str
+
+class TaskStatusResponse(BaseModel):
+    task_id: str
+    status: str
+    result: Optional[Any] = None
+    error: Optional[str] = None
+
+class UserResponse(BaseModel):
+    login: str
+    name: Optional[str] = None
+    public_repos: int
+
+class BranchesResponse(BaseModel):
+    branches: List[str]
+    next_page: Optional[int] = None  # omitted on the last page
+
+class PullRequestSummary(BaseModel):
+    id: int
+    title: str
+    head: str
+    base: str
+
+class PullRequestsResponse(BaseModel):
+    pull_requests: List[PullRequestSummary]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page; omitted on the last page
+
+class RepositoriesResponse(BaseModel):
+    repositories: List[str]
+    next_page: Optional[int] = None
+
+class RepositoryResponse(BaseModel):
+    name: str
+    full_name: str
+    description: Optional[str] = None
+    private: bool
+    topics: List[str]
+
+class IssueSummary(BaseModel):
+    number: int
+    title: str
+    state: str
+
+class IssuesResponse(BaseModel):
+    issues: List[IssueSummary]
+    next_page: Optional[int] = None
+
+class IssueCreatedResponse(BaseModel):
+    message: str
+    number: int
+    url: str
+
+class CommentResponse(BaseModel):
+    message: str
+    url: str
+
+class ReviewSummary(BaseModel):
+    user: str
+    state: str
+    body: Optional[str] = None
+
+class ReviewsResponse(BaseModel):
+    reviews: List[ReviewSummary]
+
+class ComparisonResponse(BaseModel):
+    ahead_by: int
+    behind_by: int
+    commits: List[str]
+
+class WebhookSummary(BaseModel):
+    id: int
+    url: Optional[str] = None
+
+class WebhooksResponse(BaseModel):
+    webhooks: List[WebhookSummary]
+
+class CollaboratorsResponse(BaseModel):
+    collaborators: List[str]
+
+class TeamsResponse(BaseModel):
+    teams: List[str]
+
+class RateLimitCore(BaseModel):
+    limit: int
+    remaining: int
+    reset: str
+
+class RateLimitResponse(BaseModel):
+    core: RateLimitCore
+
+class HealthResponse(BaseModel):
+    status: str
+
+class VersionResponse(BaseModel):
+    version: str
+
+@app.get("/", response_model=MessageResponse, response_model_exclude_none=True)
+async def read_root():
     return {"message": "Welcome to the MCP GitHub Server!"}
 
-@app.get("/github/me")
-def github_me():
+@app.get("/github/me", response_model=UserResponse, response_model_exclude_none=True)
+async def github_me():
     try:
-        user = github_client.get_user()
-        return {"login": user.login, "name": user.name, "public_repos": user.public_repos}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"GitHub authentication failed: {str(e)}")
+        return await github_get("/user", user_summary)
+    except GITHUB_ERRORS as e:
+        raise github_error(e, "GitHub authentication failed")
 
-@app.get("/github/branches")
-def list_branches(repo_name: str):
+@app.get("/github/branches", response_model=BranchesResponse, response_model_exclude_none=True)
+async def list_branches(repo_name: str, page: int = Query(1, ge=1), per_page: int = Query(100, ge=1, le=100)):
     try:
-        repo = github_client.get_repo(repo_name)
-        branches = repo.get_branches()
-        return {"branches": [b.name for b in branches]}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to list branches: {str(e)}")
-
-@app.post("/github/branch/create")
-def create_branch(req: BranchActionRequest):
+        result = await cached(("list_branches", repo_name, page, per_page), lambda: github_get_page(f"/repos/{repo_name}/branches", names, page, per_page))
+        return {"branches": result["items"], "next_page": result["next_page"]}
+    except GITHUB_ERRORS as e:
+        raise github_error(e, "Failed to list branches")
+
+@app.post("/github/branch/create", status_code=202, response_model=TaskAcceptedResponse, response_model_exclude_none=True)
+async def create_branch(req: BranchActionRequest):
+    task = await asyncio.to_thread(create_branch_task.delay, req.model_dump())
+    return {"task_id": task.id}
+
+@app.get("/github/pull-requests", response_model=PullRequestsResponse, response_model_exclude_none=True)
+async def list_pull_requests(repo_name: str, cursor: Optional[str] = None, per_page: int = Query(100, ge=1, le=100)):
+    async def load():
+        owner, _, name = repo_name.partition("/")
+        data = await gql(http_client, PULL_REQUESTS_QUERY, {"owner": owner, "name": name, "first": per_page, "after": cursor})
+        pulls = data["repository"]["pullRequests"]
+        next_cursor = pulls["pageInfo"]["endCursor"] if pulls["pageInfo"]["hasNextPage"] else None
+        return {"pull_requests": [{"id": pr["databaseId"], "title": pr["title"], "head": pr["headRefName"], "base": pr["baseRefName"]} for pr in pulls["nodes"]], "next_cursor": next_cursor}
     try:
-        repo = github_client.get_repo(req.repo_name)
-        base = req.base_branch or repo.get_branch("main").name
-        source = repo.get_branch(base)
-        repo.create_git_ref(ref=f"refs/heads/{req.branch_name}", sha=source.commit.sha)
-        return {"message": f"Branch '{req.branch_name}' created from '{base}'"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create branch: {str(e)}")
-
-@app.get("/github/pull-requests")
-def list_pull_requests(repo_name: str):
+        return await cached(("list_pull_requests", repo_name, cursor, per_page), load)
+    except GITHUB_ERRORS as e:
+        raise github_error(e, "Failed to list pull requests")
+
+@app.post("/github/pull-request/create", status_code=202, response_model=TaskAcceptedResponse, response_model_exclude_none=True)
+async def create_pull_request(req: PullRequestRequest):
+    task = await asyncio.to_thread(create_pull_request_task.delay, req.model_dump())
+    return {"task_id": task.id}
+
+@app.get("/github/repos", response_model=RepositoriesResponse, response_model_exclude_none=True)
+async def list_repos(page: int = Query(1, ge=1), per_page: int = Query(100, ge=1, le=100)):
     try:
-        repo = github_client.get_repo(repo_name)
-        pulls = repo.get_pulls(state="open")
-        return {"pull_requests": [{"id": pr.id, "title": pr.title, "head": pr.head.ref, "base": pr.base.ref} for pr in pulls]}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to list pull requests: {str(e)}")
-
-@app.post("/github/pull-request/create")
-def create_pull_request(req: PullRequestRequest):
+        result = await cached(("list_repos", page, per_page), lambda: github_get_page("/user/repos", full_names, page, per_page))
+        return {"repositories": result["items"], "next_page": result["next_page"]}
+    except GITHUB_ERRORS as e:
+        raise github_error(e, "Failed to list repositories")
+
+@app.get("/github/repos/stream")
+async def stream_repos():
+    """Every repository as NDJSON, one line per repo, written as each page of 100 arrives."""
+
+    # Plain GETs rather than github_fetch: the ETag cache would keep every page and make memory O(repos)
+    async def fetch_page(url: str, params: Optional[dict] = None):
+        response = await http_client.get(url, params=params)
+        response.raise_for_status()
+        return full_names(response.json()), response.links
+
     try:
-        repo = github_client.get_repo(req.repo_name)
-        pr = repo.create_pull(title=req.title, body=req.body or "", head=req.head, base=req.base)
-        return {"message": "Pull request created", "url": pr.html_url}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create pull request: {str(e)}")
-
-@app.get("/github/repos")
-def list_repos():
+        page, links = await fetch_page("/user/repos", params={"per_page": 100})
+    except GITHUB_ERRORS as e:
+        raise github_error(e, "Failed to list repositories")
+
+    async def chunks():
+        nonlocal page, links
+        while True:
+            # One chunk per page, so each page is a single send (and a single gzip flush)
+            yield b"".join(orjson.dumps({"full_name": full_name}) + b"\n" for full_name in page)
+            if "next" not in links:
+                return
+            page, links = await fetch_page(links["next"]["url"])
+
+    return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+@app.get("/github/repo", response_model=RepositoryResponse, response_model_exclude_none=True)
+async def get_repo(repo_name: str):
+    async def load():
+        owner, _, name = repo_name.partition("/")
+        data = await gql(http_client, REPOSITORY_QUERY, {"owner": owner, "name": name})
+        repo = data["repository"]
+        topics = [n["topic"]["name"] for n in repo["repositoryTopics"]["nodes"]]
+        return {"name": repo["name"], "full_name": repo["nameWithOwner"], "description": repo["description"], "private": repo["isPrivate"], "topics": topics}
     try:
-        repos = github_client.get_user().get_repos()
-        return {"repositories": [r.full_name for r in repos]}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to list repositories: {str(e)}")
+        return await cached(("get_repo", repo_name), load)
+    except GITHUB_ERRORS as e:
+        raise github_error(e, "Failed to get repository")
 
-@app.get("/github/repo")
-def get_repo(repo_name: str):
-    try:
-        repo = github_client.get_repo(repo_name)
-        return {"name": repo.name, "full_name": repo.full_name, "description": repo.description, "private": repo.private, "topics": repo.get_topics()}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get repository: {str(e)}")
+@app.post("/github/repo/create", status_code=202, response_model=TaskAcceptedResponse, response_model_exclude_none=True)
+async def create_repo(req: RepoCreateRequest):
+    task = await asyncio.to_thread(create_repo_task.delay, req.model_dump())
+    return {"task_id": task.id}
 
-@app.post("/github/repo/create")
-def create_repo(req: RepoCreateRequest):
+@app.get("/github/issues", response_model=IssuesResponse, response_model_exclude_none=True)
+async def list_issues(repo_name: str, page: int = Query(1, ge=1), per_page: int = Query(100, ge=1, le=100)):
     try:
-        if req.org_name:
-            org = github_client.get_organization(req.org_name)
-            repo = org.create_repo(name=req.name, description=req.description or "", private=bool(req.private))
-        else:
-            user = github_client.get_user()
-            repo = user.create_repo(name=req.name, description=req.description or "", private=bool(req.private))
-        return {"message": "Repository created", "url": repo.html_url}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create repository: {str(e)}")
-
-@app.get("/github/issues")
-def list_issues(repo_name: str):
-    try:
-        repo = github_client.get_repo(repo_name)
-        issues = repo.get_issues()
-        return {"issues": [{"number": i.number, "title": i.title, "state": i.state} for i in issues]}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to list issues: {str(e)}")
-
-@app.post("/github/issue/create")
-def create_issue(req: IssueCreateRequest):
+        result = await cached(("list_issues", repo_name, page, per_page), lambda: github_get_page(f"/repos/{repo_name}/issues", issue_rows, page, per_page))
+        return {"issues": result["items"], "next_page": result["next_page"]}
+    except GITHUB_ERRORS as e:
+        raise github_error(e, "Failed to list issues")
+
+@app.post("/github/issue/create", response_model=IssueCreatedResponse, response_model_exclude_none=True)
+async def create_issue(req: IssueCreateRequest):
     try:
-        repo = github_client.get_repo(req.repo_name)
-        issue = repo.create_issue(title=req.title, body=req.body or "", assignees=req.assignees or [], labels=req.labels or [])
+        repo = await run_github(get_cached_repo, req.repo_name)
+        issue = await run_github(repo.create_issue, title=req.title, body=req.body or "", assignees=req.assignees, labels=req.labels)
+        invalidate(("list_issues", req.repo_name))
         return {"message": "Issue created", "number": issue.number, "url": issue.html_url}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create issue: {str(e)}")
+    except GITHUB_ERRORS as e:
+        raise github_error(e, "Failed to create issue")
 
-@app.post("/github/issue/comment")
-def comment_issue(req: IssueCommentRequest):
+@app.post("/github/issue/comment", response_model=CommentResponse, response_model_exclude_none=True)
+async def comment_issue(req: IssueCommentRequest):
     try:
-        repo = github_client.get_repo(req.repo_name)
-        issue = repo.get_issue(number=req.issue_number)
-        comment = issue.create_comment(req.comment)
+        repo = await run_github(get_cached_repo, req.repo_name)
+        issue = await run_github(repo.get_issue, number=req.issue_number)
+        comment = await run_github(issue.create_comment, req.comment)
         return {"message": "Comment added", "url": comment.html_url}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to comment on issue: {str(e)}")
+    except GITHUB_ERRORS as e:
+        raise github_error(e, "Failed to comment on issue")
 
-@app.post("/github/issue/state")
-def set_issue_state(req: IssueStateRequest):
+@app.post("/github/issue/state", response_model=MessageResponse, response_model_exclude_none=True)
+async def set_issue_state(req: IssueStateRequest):
     try:
-        repo = github_client.get_repo(req.repo_name)
-        issue = repo.get_issue(number=req.issue_number)
-        issue.edit(state=req.state)
+        repo = await run_github(get_cached_repo, req.repo_name)
+        issue = await run_github(repo.get_issue, number=req.issue_number)
+        await run_github(issue.edit, state=req.state)
+        invalidate(("list_issues", req.repo_name), ("list_pull_requests", req.repo_name))
         return {"message": f"Issue state set to {req.state}"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to set issue state: {str(e)}")
+    except GITHUB_ERRORS as e:
+        raise github_error(e, "Failed to set issue state")
 
-@app.post("/github/pr/merge")
-def merge_pr(req: PRMergeRequest):
-    try:
-        repo = github_client.get_repo(req.repo_name)
-        pr = repo.get_pull(req.pr_number)
-        pr.merge(commit_message=req.commit_message or "Merged by MCP server")
-        return {"message": "Pull request merged"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to merge pull request: {str(e)}")
-
-@app.post("/github/pr/close")
-def close_pr(req: PRCloseRequest):
+@app.post("/github/pr/merge", status_code=202, response_model=TaskAcceptedResponse, response_model_exclude_none=True)
+async def merge_pr(req: PRMergeRequest):
+    task = await asyncio.to_thread(merge_pr_task.delay, req.model_dump())
+    return {"task_id": task.id}
+
+@app.post("/github/pr/close", response_model=MessageResponse, response_model_exclude_none=True)
+async def close_pr(req: PRCloseRequest):
     try:
-        repo = github_client.get_repo(req.repo_name)
-        pr = repo.get_pull(req.pr_number)
-        pr.edit(state="closed")
+        repo = await run_github(get_cached_repo, req.repo_name)
+        pr = await run_github(repo.get_pull, req.pr_number)
+        await run_github(pr.edit, state="closed")
+        invalidate(("list_pull_requests", req.repo_name), ("list_issues", req.repo_name))
         return {"message": "Pull request closed"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to close pull request: {str(e)}")
+    except GITHUB_ERRORS as e:
+        raise github_error(e, "Failed to close pull request")
 
-@app.post("/github/pr/comment")
-def comment_pr(req: PRCommentRequest):
+@app.post("/github/pr/comment", response_model=CommentResponse, response_model_exclude_none=True)
+async def comment_pr(req: PRCommentRequest):
     try:
-        repo = github_client.get_repo(req.repo_name)
-        pr = repo.get_pull(req.pr_number)
-        comment = pr.create_issue_comment(req.comment)
+        repo = await run_github(get_cached_repo, req.repo_name)
+        pr = await run_github(repo.get_pull, req.pr_number)
+        comment = await run_github(pr.create_issue_comment, req.comment)
         return {"message": "Comment added", "url": comment.html_url}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to comment on pull request: {str(e)}")
+    except GITHUB_ERRORS as e:
+        raise github_error(e, "Failed to comment on pull request")
 
-@app.get("/github/pr/reviews")
-def list_pr_reviews(repo_name: str, pr_number: int):
+@app.get("/github/pr/reviews", response_model=ReviewsResponse, response_model_exclude_none=True)
+async def list_pr_reviews(repo_name: str, pr_number: int):
     try:
-        repo = github_client.get_repo(repo_name)
-        pr = repo.get_pull(pr_number)
-        reviews = pr.get_reviews()
-        return {"reviews": [{"user": r.user.login, "state": r.state, "body": r.body} for r in reviews]}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to list pull request reviews: {str(e)}")
-
-@app.post("/github/branch/delete")
-def delete_branch(req: BranchDeleteRequest):
+        return {"reviews": await github_get_all(f"/repos/{repo_name}/pulls/{pr_number}/reviews", review_rows)}
+    except GITHUB_ERRORS as e:
+        raise github_error(e, "Failed to list pull request reviews")
+
+@app.post("/github/branch/delete", response_model=MessageResponse, response_model_exclude_none=True)
+async def delete_branch(req: BranchDeleteRequest):
     try:
-        repo = github_client.get_repo(req.repo_name)
-        ref = repo.get_git_ref(f"heads/{req.branch_name}")
-        ref.delete()
+        repo = await run_github(get_cached_repo, req.repo_name)
+        ref = await run_github(repo.get_git_ref, f"heads/{req.branch_name}")
+        await run_github(ref.delete)
+        invalidate(("list_branches", req.repo_name))
         return {"message": f"Branch '{req.branch_name}' deleted"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to delete branch: {str(e)}")
+    except GITHUB_ERRORS as e:
+        raise github_error(e, "Failed to delete branch")
 
-@app.post("/github/branch/compare")
-def compare_branches(req: BranchCompareRequest):
+@app.post("/github/branch/compare", response_model=ComparisonResponse, response_model_exclude_none=True)
+async def compare_branches(req: BranchCompareRequest):
     try:
-        repo = github_client.get_repo(req.repo_name)
-        comparison = repo.compare(req.base, req.head)
-        return {"ahead_by": comparison.ahead_by, "behind_by": comparison.behind_by, "commits": [c.sha for c in comparison.commits]}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to compare branches: {str(e)}")
-
-@app.get("/github/webhooks")
-def list_webhooks(repo_name: str):
+        # GitHub pages the commit list of a comparison; walk every page like PyGithub's Comparison.commits
+        comparison, links = await github_fetch(f"/repos/{req.repo_name}/compare/{req.base}...{req.head}", comparison_summary, params={"per_page": 100})
+        commits = list(comparison["commits"])
+        while "next" in links:
+            page, links = await github_fetch(links["next"]["url"], comparison_summary)
+            commits.extend(page["commits"])
+        return {**comparison, "commits": commits}
+    except GITHUB_ERRORS as e:
+        raise github_error(e, "Failed to compare branches")
+
+@app.get("/github/webhooks", response_model=WebhooksResponse, response_model_exclude_none=True)
+async def list_webhooks(repo_name: str):
     try:
-        repo = github_client.get_repo(repo_name)
-        hooks = repo.get_hooks()
-        return {"webhooks": [{"id": h.id, "url": h.config.get('url')} for h in hooks]}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to list webhooks: {str(e)}")
-
-@app.get("/github/collaborators")
-def list_collaborators(repo_name: str):
+        hooks = await cached(("list_webhooks", repo_name), lambda: github_get_all(f"/repos/{repo_name}/hooks", webhook_rows))
+        return {"webhooks": hooks}
+    except GITHUB_ERRORS as e:
+        raise github_error(e, "Failed to list webhooks")
+
+@app.get("/github/collaborators", response_model=CollaboratorsResponse, response_model_exclude_none=True)
+async def list_collaborators(repo_name: str):
     try:
-        repo = github_client.get_repo(repo_name)
-        users = repo.get_collaborators()
-        return {"collaborators": [u.login for u in users]}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to list collaborators: {str(e)}")
-
-@app.post("/github/collaborator/add")
-def add_collaborator(req: CollaboratorRequest):
+        users = await cached(("list_collaborators", repo_name), lambda: github_get_all(f"/repos/{repo_name}/collaborators", logins))
+        return {"collaborators": users}
+    except GITHUB_ERRORS as e:
+        raise github_error(e, "Failed to list collaborators")
+
+@app.post("/github/collaborator/add", response_model=MessageResponse, response_model_exclude_none=True)
+async def add_collaborator(req: CollaboratorRequest):
     try:
-        repo = github_client.get_repo(req.repo_name)
-        repo.add_to_collaborators(req.username, permission=req.permission or "push")
+        repo = await run_github(get_cached_repo, req.repo_name)
+        await run_github(repo.add_to_collaborators, req.username, permission=req.permission or "push")
+        invalidate(("list_collaborators", req.repo_name))
         return {"message": f"Collaborator '{req.username}' added with permission '{req.permission or 'push'}'"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to add collaborator: {str(e)}")
+    except GITHUB_ERRORS as e:
+        raise github_error(e, "Failed to add collaborator")
 
-@app.post("/github/collaborator/remove")
-def remove_collaborator(req: CollaboratorRequest):
+@app.post("/github/collaborator/remove", response_model=MessageResponse, response_model_exclude_none=True)
+async def remove_collaborator(req: CollaboratorRequest):
     try:
-        repo = github_client.get_repo(req.repo_name)
-        repo.remove_from_collaborators(req.username)
+        repo = await run_github(get_cached_repo, req.repo_name)
+        await run_github(repo.remove_from_collaborators, req.username)
+        invalidate(("list_collaborators", req.repo_name))
         return {"message": f"Collaborator '{req.username}' removed"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to remove collaborator: {str(e)}")
+    except GITHUB_ERRORS as e:
+        raise github_error(e, "Failed to remove collaborator")
 
-@app.get("/github/teams")
-def list_teams(org_name: str):
-    try:
-        org = github_client.get_organization(org_name)
-        teams = org.get_teams()
-        return {"teams": [t.name for t in teams]}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to list teams: {str(e)}")
-
-@app.get("/github/rate-limit")
-def rate_limit():
+@app.get("/github/teams", response_model=TeamsResponse, response_model_exclude_none=True)
+async def list_teams(org_name: str):
     try:
-        rate = github_client.get_rate_limit()
-        return {"core": {"limit": rate.core.limit, "remaining": rate.core.remaining, "reset": str(rate.core.reset)}}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get rate limit: {str(e)}")
+        teams = await cached(("list_teams", org_name), lambda: github_get_all(f"/orgs/{org_name}/teams", names))
+        return {"teams": teams}
+    except GITHUB_ERRORS as e:
+        raise github_error(e, "Failed to list teams")
 
-@app.get("/health")
-def health_check():
+@app.get("/github/rate-limit", response_model=RateLimitResponse, response_model_exclude_none=True)
+async def rate_limit():
+    try:
+        core = await cached(("rate_limit",), lambda: github_get("/rate_limit", core_rate_limit))
+        return {"core": core}
+    except GITHUB_ERRORS as e:
+        raise github_error(e, "Failed to get rate limit")
+
+# Cached listings each queued write changes, from its task result; dropped once per task, when GET /tasks/{id}
+# first sees it succeed. Until a client polls, listings can lag the write by up to the cache TTL
+TASK_INVALIDATIONS = {
+    create_branch_task.name: lambda result: [("list_branches", result["repo_name"])],
+    create_pull_request_task.name: lambda result: [("list_pull_requests", result["repo_name"]), ("list_issues", result["repo_name"])],
+    merge_pr_task.name: lambda result: [("list_pull_requests", result["repo_name"]), ("list_issues", result["repo_name"])],
+    create_repo_task.name: lambda result: [("list_repos",)],
+}
+invalidated_tasks: TTLCache = TTLCache(maxsize=4096, ttl=3600)
+
+@app.get("/tasks/{task_id}", response_model=TaskStatusResponse, response_model_exclude_none=True)
+async def get_task(task_id: str):
+    status = await asyncio.to_thread(task_status, task_id)
+    if status["status"] == "SUCCESS" and status["name"] in TASK_INVALIDATIONS and task_id not in invalidated_tasks:
+        invalidated_tasks[task_id] = True
+        invalidate(*TASK_INVALIDATIONS[status["name"]](status["result"]))
+    return status
+
+@app.get("/health", response_model=HealthResponse, response_model_exclude_none=True)
+async def health_check():
     return {"status": "ok"}
 
-@app.get("/version")
-def version():
+@app.get("/version", response_model=VersionResponse, response_model_exclude_none=True)
+async def version():
     return {"version": "0.1.0"}
 
 # Additional endpoints for GitHub integration can be added here
 
-# Placeholder for GitHub integration endpoints 
\ No newline at end of file
+# Placeholder for GitHub integration endpoints
@@ -0,0 +1,29 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    """Collapses concurrent calls for the same key into one upstream call whose result every caller receives.
+
+    The call runs as its own task, so a caller that disconnects doesn't cancel it for the others.
+    """
+
+    def __init__(self):
+        self.inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, loader: Callable[[], Awaitable[Any]]):
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(loader())
+            self.inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        return await asyncio.shield(task)
+
+    def forget(self, key: Hashable):
+        """Stop handing the in-flight call for `key` to new callers; callers already waiting still get its result."""
+        self.inflight.pop(key, None)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self.inflight.get(key) is task:
+            del self.inflight[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here so a failure nobody is still awaiting isn't logged as unhandled
@@ -0,0 +1,101 @@
+import os
+
+from celery import Celery
+from celery.result import AsyncResult
+from github import Github, GithubException, RateLimitExceededException, UnknownObjectException
+from requests.exceptions import ConnectionError, Timeout
+
+from .client import GITHUB_POOL_SIZE, GITHUB_TOKEN, forget_repo, get_cached_repo
+
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL") or os.getenv("REDIS_URL") or "redis://localhost:6379/0"
+CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND") or CELERY_BROKER_URL
+
+# Run a worker with: celery -A src.tasks worker --concurrency 4
+celery_app = Celery("mcp_server_github", broker=CELERY_BROKER_URL, backend=CELERY_RESULT_BACKEND)
+# Store task names with results so the web process knows which cached listings a finished task changed
+celery_app.conf.result_extended = True
+
+# Celery owns retries for writes: PyGithub's own retries would re-POST blindly and end in a RetryError, while each
+# task below first checks whether an ambiguous earlier attempt already landed
+worker_client = Github(GITHUB_TOKEN, pool_size=GITHUB_POOL_SIZE, retry=None)
+
+# A Timeout on a write is ambiguous like a 5xx: it is retried, and the retry checks whether the write landed
+GITHUB_FAILURES = (GithubException, ConnectionError, Timeout)
+
+def retry_or_raise(task, exc: Exception):
+    """Retry connection errors, timeouts, GitHub 5xx and rate limits with backoff; any other error would fail the same way again."""
+    if isinstance(exc, GithubException) and exc.status < 500 and not isinstance(exc, RateLimitExceededException):
+        raise exc
+    raise task.retry(exc=exc, countdown=task.default_retry_delay * 2 ** task.request.retries)
+
+def task_status(task_id: str) -> dict:
+    result = AsyncResult(task_id, app=celery_app)
+    status = {"task_id": task_id, "name": result.name, "status": result.status}
+    if result.successful():
+        status["result"] = result.result
+    elif result.failed():
+        status["error"] = str(result.result)
+    return status
+
+@celery_app.task(bind=True, max_retries=5, default_retry_delay=10)
+def create_branch_task(self, req: dict) -> dict:
+    try:
+        repo = get_cached_repo(req["repo_name"], worker_client)
+        base = req["base_branch"] or repo.get_branch("main").name
+        message = {"message": f"Branch '{req['branch_name']}' created from '{base}'", "repo_name": req["repo_name"]}
+        if self.request.retries:
+            try:
+                repo.get_git_ref(f"heads/{req['branch_name']}")
+                return message
+            except UnknownObjectException:
+                pass
+        source = repo.get_branch(base)
+        repo.create_git_ref(ref=f"refs/heads/{req['branch_name']}", sha=source.commit.sha)
+        return message
+    except GITHUB_FAILURES as exc:
+        retry_or_raise(self, exc)
+
+@celery_app.task(bind=True, max_retries=5, default_retry_delay=10)
+def create_pull_request_task(self, req: dict) -> dict:
+    try:
+        repo = get_cached_repo(req["repo_name"], worker_client)
+        if self.request.retries:
+            head = req["head"] if ":" in req["head"] else f"{repo.owner.login}:{req['head']}"
+            pr = next(iter(repo.get_pulls(state="open", head=head, base=req["base"])), None)
+            if pr is not None:
+                return {"message": "Pull request created", "url": pr.html_url, "repo_name": req["repo_name"]}
+        pr = repo.create_pull(title=req["title"], body=req["body"] or "", head=req["head"], base=req["base"])
+        return {"message": "Pull request created", "url": pr.html_url, "repo_name": req["repo_name"]}
+    except GITHUB_FAILURES as exc:
+        retry_or_raise(self, exc)
+
+@celery_app.task(bind=True, max_retries=5, default_retry_delay=10)
+def create_repo_task(self, req: dict) -> dict:
+    try:
+        if req["org_name"]:
+            owner = worker_client.get_organization(req["org_name"])
+        else:
+            owner = worker_client.get_user()
+        if self.request.retries:
+            try:
+                repo = worker_client.get_repo(f"{owner.login}/{req['name']}")
+                return {"message": "Repository created", "url": repo.html_url}
+            except UnknownObjectException:
+                pass
+        repo = owner.create_repo(name=req["name"], description=req["description"] or "", private=bool(req["private"]))
+        forget_repo(req["name"])
+        return {"message": "Repository created", "url": repo.html_url}
+    except GITHUB_FAILURES as exc:
+        retry_or_raise(self, exc)
+
+@celery_app.task(bind=True, max_retries=5, default_retry_delay=10)
+def merge_pr_task(self, req: dict) -> dict:
+    try:
+        repo = get_cached_repo(req["repo_name"], worker_client)
+        pr = repo.get_pull(req["pr_number"])
+        if self.request.retries and pr.is_merged():
+            return {"message": "Pull request merged", "repo_name": req["repo_name"]}
+        pr.merge(commit_message=req["commit_message"] or "Merged by MCP server")
+        return {"message": "Pull request merged", "repo_name": req["repo_name"]}
+    except GITHUB_FAILURES as exc:
+        retry_or_raise(self, exc)